@@ -2,13 +2,41 @@
 
 This package provides functionality to track active windows and applications,
 categorize activities, and generate detailed reports about computer usage.
+
+The public classes are imported lazily on first access so that importing the
+package (e.g. for report generation) does not load the tracker's input
+listeners and platform backends.
 """
 
-from .tracker.activity_tracker import ActivityTracker
-from .reporting.report_generator import ReportGenerator
-from .config.config_manager import ConfigManager
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .tracker.activity_tracker import ActivityTracker
+    from .reporting.report_generator import ReportGenerator
+    from .config.config_manager import ConfigManager
 
 __version__ = '1.0.0'
 __author__ = 'Activity Tracker Team'
 
-__all__ = ['ActivityTracker', 'ReportGenerator', 'ConfigManager']
\ No newline at end of file
+__all__ = ['ActivityTracker', 'ReportGenerator', 'ConfigManager']
+
+_LAZY = {
+    'ActivityTracker': '.tracker.activity_tracker',
+    'ReportGenerator': '.reporting.report_generator',
+    'ConfigManager': '.config.config_manager',
+}
+
+
+def __getattr__(name):
+    """Import public classes on first access (PEP 562)."""
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(_LAZY[name], __name__)
+    obj = getattr(module, name)
+    globals()[name] = obj
+    return obj
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
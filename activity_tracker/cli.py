@@ -1,13 +1,23 @@
 #!/usr/bin/env python3
 import os
+import sys
+import logging
 import argparse
-import datetime
-from .tracker.activity_tracker import ActivityTracker
-from .reporting.report_generator import ReportGenerator
 from .config.config_manager import ConfigManager
 
+def _show_config_location():
+    """Print where the configuration file lives."""
+    config_manager = ConfigManager()
+    print(f"Configuration file is located at: {config_manager.config_file}")
+    print("You can edit this file with a text editor to customize tracking settings.")
+
 def main():
     """Main entry point for the activity tracker CLI."""
+    # Fast path: a bare --configure needs neither the parser nor any report code
+    if sys.argv[1:] == ['--configure']:
+        _show_config_location()
+        return
+
     parser = argparse.ArgumentParser(description='Track daily activities and generate reports')
     parser.add_argument('--report', action='store_true',
                        help='Generate report without tracking')
@@ -17,40 +27,53 @@ def main():
                        help='Generate complete summary of all recorded days')
     parser.add_argument('--configure', action='store_true',
                        help='Show configuration file location')
+    parser.add_argument('--debug', action='store_true',
+                       help='Print debug messages while tracking')
     args = parser.parse_args()
 
-    config_manager = ConfigManager()
-    
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.WARNING,
+                        format='%(levelname)s - %(name)s: %(message)s')
+
+    # Heavy modules are imported only in the branch that needs them, so that
+    # reporting and configuration commands never load the input listeners.
     if args.summary:
+        from .reporting.report_generator import ReportGenerator
+
+        config_manager = ConfigManager()
         report_generator = ReportGenerator()
         report = report_generator.generate_complete_summary()
         print(report)
-        
+
         # Save report to file
         summary_file = os.path.join(config_manager.config_path, 'complete_summary.txt')
         with open(summary_file, 'w') as f:
             f.write(report)
         print(f"\nSummary saved to {summary_file}")
-    
+
     elif args.report or args.date:
+        import datetime
+        from .reporting.report_generator import ReportGenerator
+
+        config_manager = ConfigManager()
         report_generator = ReportGenerator()
         report = report_generator.generate_daily_report(args.date)
         print(report)
-        
+
         # Save report to file
         date_str = args.date if args.date else datetime.datetime.now().strftime('%Y-%m-%d')
         report_file = os.path.join(config_manager.config_path, f'report_{date_str}.txt')
         with open(report_file, 'w') as f:
             f.write(report)
         print(f"\nReport saved to {report_file}")
-    
+
     elif args.configure:
-        print(f"Configuration file is located at: {config_manager.config_file}")
-        print("You can edit this file with a text editor to customize tracking settings.")
-    
+        _show_config_location()
+
     else:
+        from .tracker.activity_tracker import ActivityTracker
+
         tracker = ActivityTracker()
         tracker.start_tracking()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,7 +1,10 @@
 #!/usr/bin/env python3
 import os
-import json
+import re
+import datetime
+import functools
 from pathlib import Path
+from ..utils import serialization
 
 class ConfigManager:
     """Manages configuration loading, saving, and defaults for the activity tracker."""
@@ -20,8 +23,19 @@ class ConfigManager:
             'Media': ['vlc', 'spotify', 'itunes', 'windows media player'],
             'Other': []
         },
-        'sampling_interval': 30
+        'sampling_interval': 30,
+        'max_sampling_interval': 120
     }
+
+    LOG_PREFIX = 'activity_'
+    LOG_SUFFIX = '.ndjson'
+    COMPRESSED_LOG_SUFFIX = '.ndjson.gz'
+    LEGACY_LOG_SUFFIX = '.json'
+    # Suffixes of activity logs, in order of preference when a day has several
+    LOG_SUFFIXES = (LOG_SUFFIX, COMPRESSED_LOG_SUFFIX, LEGACY_LOG_SUFFIX)
+
+    # Configuration directories already known to exist in this process
+    _known_directories = set()
     
     def __init__(self, config_file='activity_config.json'):
         """Initialize the configuration manager.
@@ -34,24 +48,57 @@ class ConfigManager:
         self.config_file = os.path.join(self.config_path, config_file)
         self.ensure_config_directory()
         self.config = self.load_config()
+        # Matchers used to categorize every sample, built once per load
+        self._ignored_apps = frozenset(
+            app.lower() for app in self.config.get('ignored_apps', self.DEFAULT_CONFIG['ignored_apps'])
+        )
+        self._category_patterns = tuple(
+            (category, re.compile('|'.join(re.escape(app.lower()) for app in apps)))
+            for category, apps
+            in self.config.get('categories', self.DEFAULT_CONFIG['categories']).items()
+            if apps
+        )
         
     def ensure_config_directory(self):
         """Create configuration directory if it doesn't exist."""
+        if self.config_path in self._known_directories:
+            return
         if not os.path.exists(self.config_path):
             os.makedirs(self.config_path)
+        self._known_directories.add(self.config_path)
 
     def load_config(self):
         """Load configuration from file or create default if it doesn't exist.
         
+        The parsed file is cached per process and reused for as long as its
+        modification time is unchanged, so creating several ConfigManager
+        instances only reads the file once. The returned dict is shared and
+        must not be modified in place; use save_config instead.
+        
         Returns:
             dict: The loaded configuration
         """
-        if os.path.exists(self.config_file):
-            with open(self.config_file, 'r') as f:
-                return json.load(f)
-        else:
+        try:
+            mtime_ns = os.stat(self.config_file).st_mtime_ns
+        except FileNotFoundError:
             self.save_config(self.DEFAULT_CONFIG)
             return self.DEFAULT_CONFIG
+        return self._cached_load(self.config_file, mtime_ns)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=8)
+    def _cached_load(config_file, mtime_ns):
+        """Read and parse a configuration file.
+        
+        Args:
+            config_file (str): Path to the configuration file
+            mtime_ns (int): Modification time of the file, part of the cache key
+        
+        Returns:
+            dict: The parsed configuration
+        """
+        with open(config_file, 'rb') as f:
+            return serialization.loads(f.read())
 
     def save_config(self, config):
         """Save configuration to file.
@@ -59,8 +106,8 @@ class ConfigManager:
         Args:
             config (dict): Configuration to save
         """
-        with open(self.config_file, 'w') as f:
-            json.dump(config, f, indent=4)
+        with open(self.config_file, 'wb') as f:
+            f.write(serialization.dumps(config, pretty=True))
 
     def get_config(self):
         """Get the current configuration.
@@ -70,6 +117,25 @@ class ConfigManager:
         """
         return self.config
 
+    def get_ignored_apps(self):
+        """Get the lowercased names of applications that count as system activity.
+        
+        Returns:
+            frozenset: Lowercased application names
+        """
+        return self._ignored_apps
+
+    def get_category_patterns(self):
+        """Get one compiled pattern per category for matching application names.
+        
+        Each pattern matches a lowercased application name containing any of
+        the category's keywords. Categories without keywords are omitted.
+        
+        Returns:
+            tuple: (category, compiled regex) pairs in configuration order
+        """
+        return self._category_patterns
+
     def get_sampling_interval(self):
         """Get the configured sampling interval.
         
@@ -78,6 +144,14 @@ class ConfigManager:
         """
         return self.config.get('sampling_interval', 30)
 
+    def get_max_sampling_interval(self):
+        """Get the longest interval to back off to while the active window is unchanged.
+        
+        Returns:
+            int: Maximum sampling interval in seconds
+        """
+        return self.config.get('max_sampling_interval', 4 * self.get_sampling_interval())
+
     def get_log_path(self, date_str):
         """Get the path for an activity log file.
         
@@ -87,4 +161,76 @@ class ConfigManager:
         Returns:
             str: Full path to the activity log file
         """
-        return os.path.join(self.config_path, f'activity_{date_str}.json')
\ No newline at end of file
+        return os.path.join(self.config_path, f'{self.LOG_PREFIX}{date_str}{self.LOG_SUFFIX}')
+
+    def get_legacy_log_path(self, date_str):
+        """Get the path of an activity log written in the old JSON array format.
+        
+        Args:
+            date_str (str): Date string in YYYY-MM-DD format
+        
+        Returns:
+            str: Full path to the legacy activity log file
+        """
+        return os.path.join(self.config_path, f'{self.LOG_PREFIX}{date_str}{self.LEGACY_LOG_SUFFIX}')
+
+    def find_log_path(self, date_str):
+        """Find the existing activity log for a date, in any format.
+        
+        Args:
+            date_str (str): Date string in YYYY-MM-DD format
+        
+        Returns:
+            str: Path to the log file, or None if nothing was logged that day
+        """
+        for suffix in self.LOG_SUFFIXES:
+            path = os.path.join(self.config_path, f'{self.LOG_PREFIX}{date_str}{suffix}')
+            if os.path.exists(path):
+                return path
+        return None
+
+    def list_log_files(self):
+        """List all activity log files in the configuration directory.
+        
+        When a day has logs in several formats, the first one in
+        LOG_SUFFIXES is used.
+        
+        Returns:
+            dict: Mapping of date string (YYYY-MM-DD) to log file path
+        """
+        return {date_str: entry.path for date_str, entry in self.scan_log_files().items()}
+
+    def scan_log_files(self):
+        """Scan the configuration directory for activity log files.
+        
+        Like list_log_files, but returns the directory entries so callers
+        can use their cached file type and, on Windows, stat information.
+        
+        Returns:
+            dict: Mapping of date string (YYYY-MM-DD) to os.DirEntry
+        """
+        logs = {}
+        ranks = {}
+        with os.scandir(self.config_path) as entries:
+            for entry in entries:
+                name = entry.name
+                if not name.startswith(self.LOG_PREFIX):
+                    continue
+                for rank, suffix in enumerate(self.LOG_SUFFIXES):
+                    if name.endswith(suffix):
+                        date_str = name[len(self.LOG_PREFIX):-len(suffix)]
+                        if (rank < ranks.get(date_str, len(self.LOG_SUFFIXES))
+                                and self._is_date(date_str) and entry.is_file()):
+                            logs[date_str] = entry
+                            ranks[date_str] = rank
+                        break
+        return logs
+
+    @staticmethod
+    def _is_date(date_str):
+        """Check whether a string is a YYYY-MM-DD date."""
+        try:
+            datetime.date.fromisoformat(date_str)
+        except ValueError:
+            return False
+        return len(date_str) == 10
\ No newline at end of file
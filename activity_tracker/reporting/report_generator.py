@@ -1,12 +1,70 @@
 #!/usr/bin/env python3
 import os
-import json
+import time
+import heapq
 import datetime
+from collections import Counter, defaultdict
+from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor
 from ..config.config_manager import ConfigManager
+from ..utils import serialization
+from ..utils.activity_log import iter_activities, read_activities
+
+# Underlines for report titles and section headings
+_TITLE_RULE = "=" * 40 + "\n\n"
+_SECTION_RULE = "-" * 20 + "\n"
+
+# Extracts (category, app, duration) from an activity in a single C call
+_ACTIVITY_FIELDS = itemgetter('category', 'app', 'duration')
+
+def _activity_hour(activity):
+    """Return the two-digit local hour at which an activity started.
+
+    Timestamps are Unix times; logs written by older versions store ISO 8601
+    strings instead, from which the hour is sliced out.
+    """
+    timestamp = activity['timestamp']
+    if isinstance(timestamp, str):
+        return timestamp[11:13]
+    return '%02d' % time.localtime(timestamp).tm_hour
+
+def _rollup_log(path):
+    """Reduce a day's activity log to its time totals in a single pass.
+
+    Activities are streamed from the file and never kept in a list.
+
+    Args:
+        path (str): Path to the activity log
+
+    Returns:
+        tuple: (rollup, error). rollup is a dict with the total seconds plus
+            seconds by category and by application, or None if nothing was
+            logged that day. error is the exception that stopped the read, if any.
+    """
+    total = 0
+    by_category = Counter()
+    by_app = Counter()
+    try:
+        for category, app, duration in map(_ACTIVITY_FIELDS, iter_activities(path)):
+            total += duration
+            by_category[category] += duration
+            by_app[app] += duration
+    except Exception as e:
+        return None, e
+
+    if not by_category:
+        return None, None
+    return {'total': total, 'by_category': dict(by_category), 'by_app': dict(by_app)}, None
 
 class ReportGenerator:
     """Generates activity reports from logged data."""
 
+    # Upper bound on concurrent log reads for the complete summary
+    MAX_READ_WORKERS = 16
+
+    # Per-day totals reused by the complete summary for unchanged logs
+    SUMMARY_CACHE_FILE = 'summary_cache.json'
+
     def __init__(self, config_file='activity_config.json'):
         """Initialize the report generator.
         
@@ -14,6 +72,7 @@ class ReportGenerator:
             config_file (str): Name of the configuration file
         """
         self.config_manager = ConfigManager(config_file)
+        self.summary_cache_file = os.path.join(self.config_manager.config_path, self.SUMMARY_CACHE_FILE)
 
     def generate_daily_report(self, date=None):
         """Generate a report of activities for the specified date or today.
@@ -27,77 +86,110 @@ class ReportGenerator:
         if date is None:
             date = datetime.datetime.now().strftime('%Y-%m-%d')
 
-        activity_file = self.config_manager.get_log_path(date)
-        if not os.path.exists(activity_file):
+        activity_file = self.config_manager.find_log_path(date)
+        if activity_file is None:
             return f"No activities logged for {date}."
 
         try:
-            with open(activity_file, 'r') as f:
-                activities = json.load(f)
-        except json.JSONDecodeError:
+            activities = read_activities(activity_file)
+        except (serialization.JSONDecodeError, ValueError):
             return f"Error: Invalid activity data for {date}."
 
         if not activities:
             return f"No activities logged for {date}."
 
-        total_time = sum(a['duration'] for a in activities)
-        category_times = {}
-        app_times = {}
+        # Totals and the hourly grouping are built in a single pass; each hour
+        # keeps its activities in log order.
+        total_time = 0
+        category_times = Counter()
+        app_times = Counter()
+        hour_activities = defaultdict(list)
 
         for activity in activities:
-            category = activity['category']
-            app = activity['app']
-            duration = activity['duration']
-
-            category_times[category] = category_times.get(category, 0) + duration
-            app_times[app] = app_times.get(app, 0) + duration
+            category, app, duration = _ACTIVITY_FIELDS(activity)
+            total_time += duration
+            category_times[category] += duration
+            app_times[app] += duration
+            hour_activities[_activity_hour(activity)].append(activity)
 
         # Format report
-        report = f"Activity Report for {date}\n"
-        report += "=" * 40 + "\n\n"
+        parts = [f"Activity Report for {date}\n"]
+        parts.append(_TITLE_RULE)
 
         # Category breakdown
-        report += "Time by Category:\n"
-        report += "-" * 20 + "\n"
-        for category, time_spent in sorted(category_times.items(), key=lambda x: x[1], reverse=True):
+        parts.append("Time by Category:\n")
+        parts.append(_SECTION_RULE)
+        for category, time_spent in sorted(category_times.items(), key=itemgetter(1), reverse=True):
             hours = time_spent / 3600
-            report += f"{category}: {hours:.2f} hours ({(time_spent/total_time)*100:.1f}%)\n"
+            parts.append(f"{category}: {hours:.2f} hours ({(time_spent/total_time)*100:.1f}%)\n")
 
-        report += "\n"
+        parts.append("\n")
 
         # Application breakdown
-        report += "Time by Application:\n"
-        report += "-" * 20 + "\n"
-        for app, time_spent in sorted(app_times.items(), key=lambda x: x[1], reverse=True)[:10]:
+        parts.append("Time by Application:\n")
+        parts.append(_SECTION_RULE)
+        for app, time_spent in heapq.nlargest(10, app_times.items(), key=itemgetter(1)):
             minutes = time_spent / 60
-            report += f"{app}: {minutes:.1f} minutes\n"
+            parts.append(f"{app}: {minutes:.1f} minutes\n")
 
-        report += "\n"
+        parts.append("\n")
 
         # Detailed activity list
-        report += "Detailed Activities:\n"
-        report += "-" * 20 + "\n"
+        parts.append("Detailed Activities:\n")
+        parts.append(_SECTION_RULE)
 
         # Group activities by hour for easier reading
-        hour_activities = {}
-        for activity in activities:
-            timestamp = datetime.datetime.fromisoformat(activity['timestamp'])
-            hour = timestamp.strftime('%H:00')
-            if hour not in hour_activities:
-                hour_activities[hour] = []
-            hour_activities[hour].append(activity)
-
-        # Print activities by hour
-        for hour, hour_acts in sorted(hour_activities.items()):
-            report += f"\n{hour}\n"
-            for activity in hour_acts:
+        for hour in sorted(hour_activities):
+            parts.append(f"\n{hour}:00\n")
+            for activity in hour_activities[hour]:
                 app = activity['app']
                 title = activity['title']
                 duration = activity['duration'] / 60  # convert to minutes
                 if duration >= 1:  # Only show activities that took at least a minute
-                    report += f"  - {app}: {title[:50]}{'...' if len(title) > 50 else ''} ({duration:.1f} min)\n"
+                    parts.append(f"  - {app}: {title[:50]}{'...' if len(title) > 50 else ''} ({duration:.1f} min)\n")
+
+        return ''.join(parts)
+
+    def _rollup_logs(self, paths):
+        """Reduce several activity logs, overlapping their file I/O.
+
+        Args:
+            paths (list): Paths of the activity logs to reduce
+
+        Returns:
+            list: One (rollup, error) tuple per path, in the same order
+        """
+        if len(paths) <= 1:
+            return [_rollup_log(path) for path in paths]
+        with ThreadPoolExecutor(max_workers=min(self.MAX_READ_WORKERS, len(paths))) as executor:
+            return list(executor.map(_rollup_log, paths))
+
+    def _load_summary_cache(self):
+        """Load the cached per-day totals used by the complete summary.
+
+        Returns:
+            dict: Cache entries keyed by date, empty if there is no usable cache
+        """
+        try:
+            with open(self.summary_cache_file, 'rb') as f:
+                cache = serialization.loads(f.read())
+        except (OSError, serialization.JSONDecodeError):
+            return {}
+        return cache if isinstance(cache, dict) else {}
+
+    def _save_summary_cache(self, cache):
+        """Persist the cached per-day totals.
 
-        return report
+        Args:
+            cache (dict): Cache entries keyed by date
+        """
+        tmp_path = self.summary_cache_file + '.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(serialization.dumps(cache))
+            os.replace(tmp_path, self.summary_cache_file)
+        except OSError as e:
+            print(f"Warning: Could not save summary cache: {e}")
 
     def generate_complete_summary(self):
         """Generate a summary report for all recorded days.
@@ -106,78 +198,81 @@ class ReportGenerator:
             str: Formatted summary report
         """
         # Get all activity files
-        activity_files = [f for f in os.listdir(self.config_manager.config_path)
-                         if f.startswith('activity_') and f.endswith('.json')]
+        activity_files = self.config_manager.scan_log_files()
 
         if not activity_files:
             return "No activity data found."
 
-        # Collect data from all files
-        all_days = {}
-        category_totals = {}
-        app_totals = {}
-        total_time_all = 0
-
-        for file in activity_files:
-            date = file.replace('activity_', '').replace('.json', '')
-            file_path = os.path.join(self.config_manager.config_path, file)
-
-            try:
-                with open(file_path, 'r') as f:
-                    activities = json.load(f)
-
-                if not isinstance(activities, list):
-                    print(f"Warning: Skipping {file} - invalid format")
-                    continue
-
-                if not activities:
-                    continue
+        # Reuse cached per-day totals for logs that have not changed since the
+        # last summary; usually only today's log needs to be read again
+        cache = self._load_summary_cache()
+        summary_cache = {}
+        stale_logs = []
+        for date, dir_entry in activity_files.items():
+            st = dir_entry.stat()
+            key = [dir_entry.name, st.st_mtime_ns, st.st_size]
+            entry = cache.get(date)
+            if entry is not None and entry.get('key') == key:
+                summary_cache[date] = entry
+            else:
+                stale_logs.append((date, dir_entry.path, key))
+
+        results = self._rollup_logs([file_path for _, file_path, _ in stale_logs])
+
+        for (date, file_path, key), (rollup, error) in zip(stale_logs, results):
+            if error is not None:
+                print(f"Warning: Error processing {os.path.basename(file_path)}: {error}")
+                continue
 
-                # Daily totals
-                day_total = sum(a.get('duration', 0) for a in activities if isinstance(a, dict))
-                all_days[date] = day_total
-                total_time_all += day_total
+            summary_cache[date] = {'key': key, 'rollup': rollup}
 
-                # Category and app totals
-                for activity in activities:
-                    category = activity['category']
-                    app = activity['app']
-                    duration = activity['duration']
+        if summary_cache != cache:
+            self._save_summary_cache(summary_cache)
 
-                    category_totals[category] = category_totals.get(category, 0) + duration
-                    app_totals[app] = app_totals.get(app, 0) + duration
+        # Combine the per-day totals
+        all_days = {}
+        category_totals = Counter()
+        app_totals = Counter()
+        total_time_all = 0
 
-            except (json.JSONDecodeError, Exception) as e:
-                print(f"Warning: Error processing {file}: {e}")
+        for date in activity_files:
+            entry = summary_cache.get(date)
+            if entry is None or entry['rollup'] is None:
                 continue
 
+            rollup = entry['rollup']
+            all_days[date] = rollup['total']
+            total_time_all += rollup['total']
+            category_totals.update(rollup['by_category'])
+            app_totals.update(rollup['by_app'])
+
         # Format report
-        report = "Complete Activity Summary\n"
-        report += "=" * 40 + "\n\n"
+        parts = ["Complete Activity Summary\n"]
+        parts.append(_TITLE_RULE)
 
         # Summary by day
-        report += "Time by Day:\n"
-        report += "-" * 20 + "\n"
+        parts.append("Time by Day:\n")
+        parts.append(_SECTION_RULE)
         for date, time_spent in sorted(all_days.items()):
             hours = time_spent / 3600
-            report += f"{date}: {hours:.2f} hours\n"
+            parts.append(f"{date}: {hours:.2f} hours\n")
 
-        report += "\n"
+        parts.append("\n")
 
         # Category breakdown
-        report += "Time by Category:\n"
-        report += "-" * 20 + "\n"
-        for category, time_spent in sorted(category_totals.items(), key=lambda x: x[1], reverse=True):
+        parts.append("Time by Category:\n")
+        parts.append(_SECTION_RULE)
+        for category, time_spent in sorted(category_totals.items(), key=itemgetter(1), reverse=True):
             hours = time_spent / 3600
-            report += f"{category}: {hours:.2f} hours ({(time_spent/total_time_all)*100:.1f}%)\n"
+            parts.append(f"{category}: {hours:.2f} hours ({(time_spent/total_time_all)*100:.1f}%)\n")
 
-        report += "\n"
+        parts.append("\n")
 
         # Application breakdown
-        report += "Time by Application:\n"
-        report += "-" * 20 + "\n"
-        for app, time_spent in sorted(app_totals.items(), key=lambda x: x[1], reverse=True)[:15]:
+        parts.append("Time by Application:\n")
+        parts.append(_SECTION_RULE)
+        for app, time_spent in heapq.nlargest(15, app_totals.items(), key=itemgetter(1)):
             hours = time_spent / 3600
-            report += f"{app}: {hours:.2f} hours\n"
+            parts.append(f"{app}: {hours:.2f} hours\n")
 
-        return report
\ No newline at end of file
+        return ''.join(parts)
\ No newline at end of file
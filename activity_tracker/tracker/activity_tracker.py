@@ -1,15 +1,32 @@
 #!/usr/bin/env python3
 import os
+import re
 import time
-import json
+import logging
 import datetime
 import signal
-import sys
-import subprocess
 import threading
-from pynput import keyboard
-from .window_tracker import WindowTracker
+import functools
+from pynput import keyboard, mouse
+from . import window_tracker
 from ..config.config_manager import ConfigManager
+from ..utils.activity_log import ActivityLog, compress_log, read_activities
+
+log = logging.getLogger(__name__)
+
+# Window title keywords used when the application matches no category. The
+# patterns are tried in order, so an earlier category wins when a title
+# matches several of them.
+_TITLE_CATEGORIES = (
+    ('Communication', re.compile(r'email|mail')),
+    ('Documents', re.compile(r'document|\.doc|\.txt')),
+    # Source file extensions only count as whole words, so '.com' or
+    # '.json' in a title is not mistaken for '.c' or '.js'
+    ('Coding', re.compile(r'code|script|\.(?:py|js|html?|css|java|go|c(?:pp)?|rs|ts)\b')),
+)
+
+# Activity key shared by all samples logged as Idle
+_IDLE_KEY = (None, None, 'Idle', 'User inactive')
 
 class ActivityTracker:
     """Tracks and logs user activity based on active windows."""
@@ -21,50 +38,53 @@ class ActivityTracker:
             config_file (str): Name of the configuration file
         """
         self.config_manager = ConfigManager(config_file)
-        self.today_date = datetime.datetime.now().strftime('%Y-%m-%d')
-        self.activities = []
-        self.current_activity = None
+        self._build_category_matchers()
         self.sampling_interval = self.config_manager.get_sampling_interval()
-        self._last_mouse_pos = None
+        self.max_sampling_interval = max(self.sampling_interval,
+                                         self.config_manager.get_max_sampling_interval())
+        # Time until the next sample; grows while the active window is unchanged
+        self._interval = self.sampling_interval
         self._last_window_title = None
-        self._last_key_state = None
-        self._load_today_activities()
+        self._start_day()
         
+        # Input callbacks only store a timestamp; bind the clock once for them
+        self._mono = time.monotonic
+
         # Keyboard activity monitoring
         self.is_typing = False
-        self.last_keypress_time = time.time()
+        self.last_keypress_time = float('-inf')
         self.keyboard_listener = None
+        self.mouse_listener = None
         self.typing_inactivity_threshold = 2.0  # Consider user not typing after 2 seconds of keyboard inactivity
         
         # User activity tracking
-        self.last_activity_time = time.time()
+        self.last_activity_time = self._mono()
         self.idle_threshold = 30  # 30 seconds of inactivity to be considered idle
         self.is_idle = False
+
+        # Set when tracking should stop; also used to wait between samples
+        self._stop_event = threading.Event()
         
-        # Start keyboard monitoring
+        # Start keyboard and mouse monitoring
         self._start_keyboard_monitoring()
+        self._start_mouse_monitoring()
 
     def _on_key_press(self, key):
-        """Callback for keyboard press events."""
-        self.last_keypress_time = time.time()
-        self.last_activity_time = time.time()  # Update last activity time on key press
-        if not self.is_typing:
-            self.is_typing = True
-            print("Debug - User started typing")
-        
-        # Reset idle state if user was idle
-        if self.is_idle:
-            self.is_idle = False
-            print("Debug - User no longer idle (keyboard activity)")
+        """Callback for keyboard press events.
+
+        Runs on every keystroke, so it only records the time; typing and idle
+        state are derived from it once per sample.
+        """
+        self.last_keypress_time = self.last_activity_time = self._mono()
 
     def _start_keyboard_monitoring(self):
         """Start keyboard monitoring in a separate thread."""
         try:
             self.keyboard_listener = keyboard.Listener(on_press=self._on_key_press)
             self.keyboard_listener.start()
-            print("Debug - Keyboard monitoring started successfully")
+            log.debug("Keyboard monitoring started successfully")
         except Exception as e:
-            print(f"Debug - Failed to start keyboard monitoring: {e}")
+            log.debug("Failed to start keyboard monitoring: %s", e)
             # Fallback to the old method if pynput initialization fails
             self.keyboard_listener = None
 
@@ -74,33 +94,114 @@ class ActivityTracker:
             self.keyboard_listener.stop()
             self.keyboard_listener = None
 
+    def _on_mouse_activity(self, *args):
+        """Callback for mouse move, click and scroll events."""
+        self.last_activity_time = self._mono()
+
+    def _start_mouse_monitoring(self):
+        """Start mouse monitoring in a separate thread."""
+        try:
+            self.mouse_listener = mouse.Listener(
+                on_move=self._on_mouse_activity,
+                on_click=self._on_mouse_activity,
+                on_scroll=self._on_mouse_activity,
+            )
+            self.mouse_listener.start()
+            log.debug("Mouse monitoring started successfully")
+        except Exception as e:
+            log.debug("Failed to start mouse monitoring: %s", e)
+            self.mouse_listener = None
+
+    def _stop_mouse_monitoring(self):
+        """Stop mouse monitoring."""
+        if self.mouse_listener:
+            self.mouse_listener.stop()
+            self.mouse_listener = None
+
+    def _check_window_change(self, window_info):
+        """Treat a change of the active window title as user activity.
+        
+        Args:
+            window_info (dict): Information about the active window
+        """
+        if not window_info:
+            return
+
+        window_title = window_info['title']
+        if self._last_window_title is None:
+            self._last_window_title = window_title
+        elif window_title != self._last_window_title:
+            log.debug("Window changed")
+            self.last_activity_time = self._mono()  # Update last activity time
+            self._last_window_title = window_title
+
     def _check_typing_status(self):
         """Check if user is currently typing based on recent keypresses."""
         if not self.keyboard_listener:
             return False  # If keyboard monitoring is not available
             
-        current_time = time.time()
-        elapsed = current_time - self.last_keypress_time
-        
-        # Update typing status based on elapsed time since last keypress
-        if self.is_typing and elapsed > self.typing_inactivity_threshold:
-            self.is_typing = False
-            print(f"Debug - User stopped typing (inactive for {elapsed:.2f} seconds)")
+        elapsed = self._mono() - self.last_keypress_time
+        is_typing = elapsed <= self.typing_inactivity_threshold
+
+        if is_typing != self.is_typing:
+            self.is_typing = is_typing
+            if is_typing:
+                log.debug("User started typing")
+            else:
+                log.debug("User stopped typing (inactive for %.2f seconds)", elapsed)
             
         return self.is_typing
 
-    def _load_today_activities(self):
-        """Load today's activities if file exists."""
-        today_log = self.config_manager.get_log_path(self.today_date)
-        if os.path.exists(today_log):
-            with open(today_log, 'r') as f:
-                self.activities = json.load(f)
+    def _start_day(self):
+        """Switch to the current day's log."""
+        now = datetime.datetime.now()
+        self.today_date = now.strftime('%Y-%m-%d')
+        # Epoch time of the next local midnight, checked once per sample
+        self._today_end = datetime.datetime.combine(
+            now.date() + datetime.timedelta(days=1), datetime.time()).timestamp()
+        # A crash loses at most as much time as a few unsynced samples
+        self.activity_log = ActivityLog(
+            self.config_manager.get_log_path(self.today_date),
+            max_pending_duration=ActivityLog.SYNC_INTERVAL * self.sampling_interval)
+        # Only the last activity is kept in memory; earlier ones are only
+        # needed by the reports, which read them from the log
+        self.current_activity = None
+        # Monotonic time up to which current_activity's duration accounts for
+        self._credited_until = time.monotonic()
+        # Identifies the window of the last logged activity, see log_current_activity
+        self._last_key = None
+        self._migrate_legacy_log()
+        self._compress_closed_logs()
+
+    def _migrate_legacy_log(self):
+        """Convert today's log to NDJSON if it was left in the old JSON array format.
 
-    def _save_activities(self):
-        """Save activities to today's log file."""
+        New samples can then be appended to it.
+        """
         today_log = self.config_manager.get_log_path(self.today_date)
-        with open(today_log, 'w') as f:
-            json.dump(self.activities, f, indent=4)
+        legacy_log = self.config_manager.get_legacy_log_path(self.today_date)
+        if not os.path.exists(today_log) and os.path.exists(legacy_log):
+            self.activity_log.write_all(read_activities(legacy_log))
+            os.remove(legacy_log)
+
+    def _compress_closed_logs(self):
+        """Gzip the NDJSON logs of days before today.
+
+        Past days are never written again, so they are only kept compressed.
+        """
+        for date_str, path in self.config_manager.list_log_files().items():
+            if date_str < self.today_date and path.endswith(ConfigManager.LOG_SUFFIX):
+                try:
+                    compress_log(path)
+                except OSError as e:
+                    log.warning("Could not compress %s: %s", path, e)
+
+    def _build_category_matchers(self):
+        """Set up the precompiled category matchers from the configuration."""
+        self._ignored_apps = self.config_manager.get_ignored_apps()
+        self._category_patterns = self.config_manager.get_category_patterns()
+        # The active window rarely changes between samples
+        self._categorize_cached = functools.lru_cache(maxsize=256)(self._categorize)
 
     def categorize_activity(self, window_info):
         """Categorize the activity based on the application name and window title.
@@ -114,177 +215,226 @@ class ActivityTracker:
         if not window_info:
             return "Idle"
 
-        config = self.config_manager.get_config()
-        app_name = window_info['app'].lower()
-        title = window_info['title'].lower()
+        # The cache is keyed on the raw strings, so repeated samples of the
+        # same window do not even lowercase them
+        return self._categorize_cached(window_info['app'], window_info['title'])
+
+    def _categorize(self, app_name, title):
+        """Categorize an application name and window title.
+        
+        Args:
+            app_name (str): Application name
+            title (str): Window title
+            
+        Returns:
+            str: Category of the activity
+        """
+        app_name = app_name.lower()
+        title = title.lower()
 
         # Check if app is in ignored list
-        if app_name in [x.lower() for x in config['ignored_apps']]:
+        if app_name in self._ignored_apps:
             return "System"
 
         # Check categories
-        for category, apps in config['categories'].items():
-            if any(app.lower() in app_name for app in apps):
+        for category, pattern in self._category_patterns:
+            if pattern.search(app_name):
                 return category
 
         # Special categorization based on window title
-        if "email" in title or "mail" in title:
-            return "Communication"
-        if "document" in title or ".doc" in title or ".txt" in title:
-            return "Documents"
-        if "code" in title or "script" in title or any(ext in title for ext in ['.py', '.js', '.html', '.css', '.java', '.go', '.c', '.cpp']):
-            return "Coding"
+        for category, pattern in _TITLE_CATEGORIES:
+            if pattern.search(title):
+                return category
 
         # Default category
         return "Other"
 
     def log_current_activity(self):
         """Log the current user activity."""
-        timestamp = datetime.datetime.now().isoformat()
-        
-        if self.is_idle:
-            print("Debug - Logging activity as Idle due to inactivity")
+        wall_now = time.time()
+        if wall_now >= self._today_end:
+            # The running activity is credited up to midnight only
+            self._credit_elapsed(self._mono() - (wall_now - self._today_end))
+            self.activity_log.close()
+            self._start_day()
+
+        # While the user is away there is no need to look up the active
+        # window; the sample is logged as Idle either way
+        idle_time = window_tracker.get_idle_time()
+        if idle_time is not None and idle_time >= self.idle_threshold:
+            log.debug("No input for %.1f seconds, skipping window lookup", idle_time)
+            window_info = None
+        else:
+            window_info = window_tracker.get_active_window_info()
+        log.debug("Current window info: %s", window_info)
+
+        self._check_window_change(window_info)
+        self.check_idle_status()
+
+        if self.is_idle or not window_info:
+            if self.is_idle:
+                log.debug("Logging activity as Idle due to inactivity")
+            else:
+                log.debug("No window info detected, marking as Idle")
+            key = _IDLE_KEY
+            is_typing = None
+        else:
+            is_typing = self._check_typing_status()
+            log.debug("Active window detected: %s - %s - Typing: %s",
+                      window_info['app'], window_info['title'], is_typing)
+            # (pid, create_time) identifies the process even if its PID is reused
+            key = (window_info.get('pid'), window_info.get('create_time'),
+                   window_info['app'], window_info['title'])
+
+        # A new activity is credited one sampling_interval ahead; any time
+        # beyond that, e.g. while sampling backs off, is added at the next
+        # sample so durations follow the elapsed time between samples.
+        last = self.current_activity
+        now = self._mono()
+        credit = self._add_elapsed(now)
+
+        # If this is the same activity as before, update duration instead of
+        # adding new. Only the typing status may differ from the last sample.
+        # Sampling backs off while the same activity continues.
+        if not self.is_idle and key == self._last_key and last is not None:
+            self._interval = min(self._interval * 2, self.max_sampling_interval)
+            if is_typing is not None:
+                last['is_typing'] = is_typing
+                last['title'] = window_info['title'] + (" (typing)" if is_typing else "")
+            self.activity_log.replace_last(last)
+            return
+        if credit > 0:
+            self.activity_log.replace_last(last)
+
+        # If different activity or no current activity, add new one and
+        # return to the base sampling interval. The timestamp is only needed
+        # here, not when extending the last activity. It is stored as whole
+        # Unix seconds; reports convert it to local time.
+        self._interval = self.sampling_interval
+        timestamp = int(time.time())
+        if is_typing is None:
             activity = {
                 'timestamp': timestamp,
                 'app': 'Idle',
                 'title': 'User inactive',
                 'category': 'Idle',
-                'duration': self.sampling_interval
+                'duration': self._interval
             }
         else:
-            window_info = WindowTracker.get_active_window_info()
-            
-            print(f"Debug - Current window info: {window_info}")  # Debug log
-
-            if not window_info:
-                print("Debug - No window info detected, marking as Idle")  # Debug log
-                activity = {
-                    'timestamp': timestamp,
-                    'app': 'Idle',
-                    'title': 'User inactive',
-                    'category': 'Idle',
-                    'duration': self.sampling_interval
-                }
-            else:
-                category = self.categorize_activity(window_info)
-                is_typing = self._check_typing_status()
-                title_suffix = " (typing)" if is_typing else ""
-                print(f"Debug - Active window detected: {window_info['app']} - {window_info['title']} - Typing: {is_typing}")
-                
-                activity = {
-                    'timestamp': timestamp,
-                    'app': window_info['app'],
-                    'title': window_info['title'] + title_suffix,
-                    'category': category,
-                    'duration': self.sampling_interval,
-                    'is_typing': is_typing
-                }
-
-        # If this is the same activity as before, update duration instead of adding new
-        if not self.is_idle and self.current_activity and self.activities and 'app' in activity:
-            # Consider same activity if app and title match, or if only typing status changed
-            is_same_activity = (
-                self.current_activity.get('app') == activity.get('app') and
-                self.current_activity.get('title', '').replace(" (typing)", "") == activity.get('title', '').replace(" (typing)", "")
-            )
-            if is_same_activity:
-                self.activities[-1]['duration'] += self.sampling_interval
-                # Update typing status in case it changed
-                if 'is_typing' in activity:
-                    self.activities[-1]['is_typing'] = activity['is_typing']
-                    self.activities[-1]['title'] = activity['title']
-                self.current_activity = self.activities[-1]
-                return
-
-        # If different activity or no current activity, add new one
-        self.activities.append(activity)
+            activity = {
+                'timestamp': timestamp,
+                'app': window_info['app'],
+                'title': window_info['title'] + (" (typing)" if is_typing else ""),
+                'category': self.categorize_activity(window_info),
+                'duration': self._interval,
+                'is_typing': is_typing
+            }
         self.current_activity = activity
+        self._last_key = key
+        self._credited_until = now + self._interval
 
         # Save to file
-        self._save_activities()
+        self.activity_log.append(activity)
+
+    def _add_elapsed(self, now):
+        """Add the time since the last activity was last credited to its duration.
+
+        Each credit is capped at max_sampling_interval, so time the system
+        spent suspended is not counted as activity.
+
+        Args:
+            now (float): Monotonic time to credit the activity up to
+
+        Returns:
+            int: Seconds added to the activity's duration
+        """
+        if self.current_activity is None:
+            return 0
+        credit = int(min(now - self._credited_until, self.max_sampling_interval))
+        if credit <= 0:
+            return 0
+        self.current_activity['duration'] += credit
+        self._credited_until += credit
+        return credit
+
+    def _credit_elapsed(self, now):
+        """Credit the last activity up to a monotonic time and log the update.
+
+        Used before the log is closed, when no further sample would add the
+        time since the last one.
+
+        Args:
+            now (float): Monotonic time to credit the activity up to
+        """
+        if self._add_elapsed(now):
+            self.activity_log.replace_last(self.current_activity)
 
     def handle_exit(self, signum, frame):
-        """Handle exit signals gracefully."""
+        """Handle exit signals gracefully.
+
+        Runs as a signal handler, so it only asks the sampling loop to stop.
+        The loop finishes the current sample and then cleans up.
+        """
+        self._stop_event.set()
+
+    def _shutdown(self):
+        """Flush the activity log and stop the input listeners."""
         print("\nTracking stopped.")
+        self._credit_elapsed(self._mono())
+        self.activity_log.close()
         self._stop_keyboard_monitoring()
-        sys.exit(0)
+        self._stop_mouse_monitoring()
 
     def check_idle_status(self):
         """Check if user has been inactive for the idle threshold period."""
-        current_time = time.time()
-        idle_duration = current_time - self.last_activity_time
-        
-        # If idle duration exceeds threshold, mark as idle
-        if idle_duration >= self.idle_threshold:
-            if not self.is_idle:  # Only log transition to idle once
-                self.is_idle = True
-                print(f"Debug - User is now idle (inactive for {idle_duration:.1f} seconds)")
-            return True
-        return False
+        idle_duration = self._mono() - self.last_activity_time
+        is_idle = idle_duration >= self.idle_threshold
+
+        # Only log transitions between idle and active
+        if is_idle != self.is_idle:
+            self.is_idle = is_idle
+            if is_idle:
+                log.debug("User is now idle (inactive for %.1f seconds)", idle_duration)
+            else:
+                log.debug("User no longer idle")
+        return is_idle
 
     def start_tracking(self):
         """Start tracking user activity."""
         print(f"Activity tracking started. Sampling every {self.sampling_interval} seconds.")
+        if self.max_sampling_interval > self.sampling_interval:
+            print(f"Backing off to {self.max_sampling_interval} seconds while the active window is unchanged.")
         print(f"Press Ctrl+C to stop tracking.")
-        print(f"Debug - Using {self.idle_threshold}s idle threshold for mouse and keyboard")
+        log.debug("Using %ss idle threshold for mouse and keyboard", self.idle_threshold)
 
         # Set up signal handlers for graceful exit
         signal.signal(signal.SIGINT, self.handle_exit)
         signal.signal(signal.SIGTERM, self.handle_exit)
 
         try:
-            while True:
+            # Schedule samples against a fixed monotonic grid so the time spent
+            # sampling does not make the interval drift
+            deadline = time.monotonic()
+            while not self._stop_event.is_set():
                 try:
-                    # Get current mouse position
-                    try:
-                        mouse_info = subprocess.check_output(['xdotool', 'getmouselocation']).decode()
-                        current_mouse = mouse_info.strip()
-                        
-                        # Check for mouse movement
-                        if self._last_mouse_pos is None:
-                            self._last_mouse_pos = current_mouse
-                        elif current_mouse != self._last_mouse_pos:
-                            print(f"Debug - Mouse movement detected {current_mouse} -- {self._last_mouse_pos}")
-                            self.last_activity_time = time.time()  # Update last activity time
-                            if self.is_idle:
-                                self.is_idle = False
-                                print("Debug - User no longer idle (mouse movement)")
-                    except Exception as e:
-                        print(f"Debug - Error getting mouse position: {e}")
-
-                    # Get active window info for title comparison
-                    try:
-                        window_id = subprocess.check_output(['xdotool', 'getactivewindow']).decode().strip()
-                        window_title = subprocess.check_output(['xdotool', 'getwindowname', window_id]).decode().strip()
-                        
-                        # Detect window title changes
-                        if self._last_window_title is None:
-                            self._last_window_title = window_title
-                        elif window_title != self._last_window_title:
-                            print("Debug - Window changed")
-                            self.last_activity_time = time.time()  # Update last activity time
-                            self._last_window_title = window_title
-                            if self.is_idle:
-                                self.is_idle = False
-                                print("Debug - User no longer idle (window change)")
-                    except Exception as e:
-                        print(f"Debug - Error getting window info: {e}")
-                    
-                    # Update mouse position for next comparison
-                    self._last_mouse_pos = current_mouse
-                    
-                    # Check if user is idle
-                    self.check_idle_status()
-                    
-                    # Log the current activity (idle or active)
+                    # Check for idleness and log the current activity (idle or active)
                     self.log_current_activity()
 
                 except Exception as e:
-                    print(f"Debug - Error during tracking: {e}")
+                    log.warning("Error during tracking: %s", e)
                 
-                time.sleep(self.sampling_interval)
+                deadline += self._interval
+                sleep_for = deadline - time.monotonic()
+                if sleep_for < -self._interval:
+                    # More than a whole interval behind (e.g. after a system
+                    # suspend): restart the grid instead of firing a burst
+                    # of back-to-back samples to catch up
+                    deadline = time.monotonic()
+                    sleep_for = 0
+                self._stop_event.wait(max(0, sleep_for))
 
         except Exception as e:
             print(f"Error during tracking: {e}")
-            self._stop_keyboard_monitoring()
-            self.handle_exit(None, None)
\ No newline at end of file
+
+        finally:
+            self._shutdown()
\ No newline at end of file
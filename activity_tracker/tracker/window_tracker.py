@@ -1,172 +1,531 @@
 #!/usr/bin/env python3
+import json
+import ctypes
+import ctypes.util
+import atexit
+import logging
+import functools
+import select
+import shutil
 import platform
 import subprocess
 import psutil
 
-class WindowTracker:
-    """Tracks active window information across different platforms."""
+log = logging.getLogger(__name__)
+
+# The platform cannot change while the tracker runs
+_SYSTEM = platform.system()
+
+# JavaScript for Automation helper kept running on macOS. Each newline
+# written to its stdin is answered with one JSON line describing the
+# frontmost application and its main window, so osascript is started once
+# instead of on every sample.
+_MACOS_HELPER_SCRIPT = '''
+ObjC.import('Foundation');
+var stdin = $.NSFileHandle.fileHandleWithStandardInput;
+var stdout = $.NSFileHandle.fileHandleWithStandardOutput;
+var events = Application('System Events');
+while (stdin.availableData.length > 0) {
+    var info = null;
+    try {
+        var proc = events.applicationProcesses.whose({frontmost: true})[0];
+        var title = '';
+        var windows = proc.windows();
+        for (var i = 0; i < windows.length; i++) {
+            try {
+                if (windows[i].attributes.byName('AXMain').value()) {
+                    title = windows[i].name();
+                    break;
+                }
+            } catch (e) {}
+        }
+        info = {app: proc.name(), title: title || '', pid: proc.unixId()};
+    } catch (e) {}
+    stdout.writeData($(JSON.stringify(info) + '\\n').dataUsingEncoding($.NSUTF8StringEncoding));
+}
+'''
+
+# Number of process lookups between sweeps of the process cache
+PROCESS_CACHE_PRUNE_INTERVAL = 100
 
-    _instance = None
+# Seconds to wait for the macOS helper before falling back to osascript
+MACOS_HELPER_TIMEOUT = 5
 
-    def __new__(cls):
-        """Create a singleton instance of WindowTracker."""
-        if cls._instance is None:
-            cls._instance = super(WindowTracker, cls).__new__(cls)
-            cls._instance.__initialized = False
-        return cls._instance
+
+class _State:
+    """Connections and caches shared by all window queries in the process."""
+
+    __slots__ = ('deps_checked', 'xlib', 'xlib_unavailable', 'xss', 'xss_unavailable',
+                 'process_cache', 'process_lookups', 'osa', 'osa_unavailable',
+                 'pyobjc_unavailable')
 
     def __init__(self):
-        """Initialize the window tracker and check for required dependencies."""
-        if not hasattr(self, '__initialized') or not self.__initialized:
-            if platform.system() == 'Linux':
-                try:
-                    # Check for xdotool
-                    subprocess.run(['which', 'xdotool'], check=True, capture_output=True)
-                except subprocess.CalledProcessError:
-                    print("Warning: xdotool is not installed. Please install it for better window tracking.")
-                
-                try:
-                    # Check for wmctrl
-                    subprocess.run(['which', 'wmctrl'], check=True, capture_output=True)
-                except subprocess.CalledProcessError:
-                    print("Error: wmctrl is not installed. Please install it for window tracking to work.")
-                    print("Run: sudo apt-get install wmctrl")
-            self.__initialized = True
-
-    @classmethod
-    def get_active_window_info(cls):
-        """Get information about the currently active window.
-        
-        Returns:
-            dict: Dictionary containing app name, window title, and process ID,
-                 or None if unable to get window information
-        """
-        tracker = cls()
-        system = platform.system()
-        print(f"Debug - Operating System: {system}")  # Debug log
+        self.deps_checked = False
+        self.xlib = None
+        self.xlib_unavailable = False
+        self.xss = None
+        self.xss_unavailable = False
+        self.process_cache = {}
+        self.process_lookups = 0
+        self.osa = None
+        self.osa_unavailable = False
+        self.pyobjc_unavailable = False
+
+
+class _XScreenSaverInfo(ctypes.Structure):
+    """XScreenSaverInfo from the X11 screen saver extension (libXss)."""
+
+    _fields_ = [
+        ('window', ctypes.c_ulong),
+        ('state', ctypes.c_int),
+        ('kind', ctypes.c_int),
+        ('til_or_since', ctypes.c_ulong),
+        ('idle', ctypes.c_ulong),
+        ('eventMask', ctypes.c_ulong),
+    ]
+
+
+_state = _State()
+
+
+def _check_deps():
+    """Warn about missing command line tools used when Xlib is unavailable."""
+    _state.deps_checked = True
+    log.debug("Operating System: %s", _SYSTEM)
+    if _SYSTEM == 'Linux' and _get_xlib_session() is None:
+        if shutil.which('xdotool') is None and shutil.which('wmctrl') is None:
+            log.warning("python-xlib is unavailable and neither xdotool nor wmctrl is installed, "
+                        "so the active window cannot be detected. Install python-xlib, "
+                        "or xdotool as a fallback.")
+
+
+def get_active_window_info():
+    """Get information about the currently active window.
+    
+    Returns:
+        dict: Dictionary containing app name, window title, and process ID,
+             or None if unable to get window information
+    """
+    if not _state.deps_checked:
+        _check_deps()
+    if _get_platform_info is None:
+        return None
+    try:
+        return _get_platform_info()
+    except Exception as e:
+        log.error("Error getting active window: %s", e)
+        return None
+
+
+def _get_xss_session():
+    """Load libXss and open an X display for idle queries on first use.
+
+    Returns:
+        tuple: (libXss, display, root window, info buffer), or None if the
+            screen saver extension cannot be used
+    """
+    if _state.xss is None and not _state.xss_unavailable:
+        _state.xss_unavailable = True
+        if _SYSTEM != 'Linux':
+            return None
+        x11_name = ctypes.util.find_library('X11')
+        xss_name = ctypes.util.find_library('Xss')
+        if not x11_name or not xss_name:
+            log.debug("libXss not found, idle time unavailable")
+            return None
         try:
-            if system == 'Windows':
-                return tracker._get_windows_info()
-            elif system == 'Darwin':
-                return tracker._get_macos_info()
-            elif system == 'Linux':
-                print("Debug - Using Linux window tracking")  # Debug log
-                info = tracker._get_linux_info()
-                print(f"Debug - Linux window info: {info}")  # Debug log
-                return info
+            x11 = ctypes.cdll.LoadLibrary(x11_name)
+            xss = ctypes.cdll.LoadLibrary(xss_name)
+        except OSError as e:
+            log.debug("Could not load libXss: %s", e)
             return None
-        except Exception as e:
-            print(f"Error getting active window: {e}")
+
+        x11.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        x11.XOpenDisplay.restype = ctypes.c_void_p
+        x11.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+        x11.XDefaultRootWindow.restype = ctypes.c_ulong
+        xss.XScreenSaverAllocInfo.restype = ctypes.POINTER(_XScreenSaverInfo)
+        xss.XScreenSaverQueryInfo.argtypes = [ctypes.c_void_p, ctypes.c_ulong,
+                                              ctypes.POINTER(_XScreenSaverInfo)]
+        xss.XScreenSaverQueryInfo.restype = ctypes.c_int
+
+        display = x11.XOpenDisplay(None)
+        if not display:
+            log.debug("Could not open X display, idle time unavailable")
             return None
+        _state.xss = (xss, display, x11.XDefaultRootWindow(display), xss.XScreenSaverAllocInfo())
+        _state.xss_unavailable = False
+    return _state.xss
+
+
+def get_idle_time():
+    """Get the time since the last keyboard or mouse input.
+
+    The X server keeps track of this, so asking it is much cheaper than
+    looking up the active window.
+
+    Returns:
+        float: Idle time in seconds, or None if it cannot be determined
+    """
+    session = _get_xss_session()
+    if session is None:
+        return None
+    xss, display, root, info = session
+    if not xss.XScreenSaverQueryInfo(display, root, info):
+        return None
+    return info.contents.idle / 1000
+
+
+@functools.lru_cache(maxsize=None)
+def _win32():
+    """Import the pywin32 modules on first use.
+
+    Returns:
+        tuple: (win32gui, win32process)
+    """
+    import win32gui
+    import win32process
+    return win32gui, win32process
+
+
+@functools.lru_cache(maxsize=None)
+def _xlib():
+    """Import the python-xlib modules on first use.
+
+    Returns:
+        tuple: (Xlib.display, Xlib.X)
+    """
+    from Xlib import display, X
+    return display, X
+
+
+@functools.lru_cache(maxsize=None)
+def _pyobjc():
+    """Import the PyObjC frameworks on first use.
+
+    Returns:
+        tuple: (AppKit, Quartz), or None if PyObjC is not installed
+    """
+    try:
+        import AppKit
+        import Quartz
+    except ImportError:
+        return None
+    return AppKit, Quartz
+
+
+def _get_process_info(pid, window_id=None):
+    """Read a process's name and start time in a single pass.
+
+    The start time distinguishes processes when a PID is reused. Results
+    are cached per (pid, window_id), since the focused window usually
+    stays the same for many samples.
+
+    Args:
+        pid (int): Process ID
+        window_id: Identifier of the window owned by the process, if known
+
+    Returns:
+        tuple: (process name, creation time as epoch seconds)
+    """
+    key = (pid, window_id)
+    info = _state.process_cache.get(key) if window_id is not None else None
+    if info is None:
+        process = psutil.Process(pid)
+        with process.oneshot():
+            info = (process.name(), process.create_time())
+        if window_id is not None:
+            _state.process_cache[key] = info
+
+    _state.process_lookups += 1
+    if _state.process_lookups % PROCESS_CACHE_PRUNE_INTERVAL == 0:
+        _state.process_cache = {k: v for k, v in _state.process_cache.items()
+                                if psutil.pid_exists(k[0])}
+    return info
+
+
+def _get_windows_info():
+    """Get active window information for Windows.
+
+    Returns:
+        dict: Window information for Windows
+    """
+    win32gui, win32process = _win32()
+
+    window = win32gui.GetForegroundWindow()
+    _, pid = win32process.GetWindowThreadProcessId(window)
+    title = win32gui.GetWindowText(window)
+    try:
+        app_name, create_time = _get_process_info(pid, window)
+        return {'app': app_name, 'title': title, 'pid': pid, 'create_time': create_time}
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        return None
+
+
+def _get_pyobjc_info(AppKit, Quartz):
+    """Get active window information for macOS in-process through PyObjC.
+
+    Window titles are only visible with the Screen Recording permission;
+    without it the title is missing and the caller has to fall back to
+    System Events.
+
+    Args:
+        AppKit: The AppKit module
+        Quartz: The Quartz module
+
+    Returns:
+        dict: Window information, None if no application is frontmost, or
+            False if the window title is not available
+    """
+    app = AppKit.NSWorkspace.sharedWorkspace().frontmostApplication()
+    if app is None:
+        return None
+    pid = app.processIdentifier()
 
-    def _get_windows_info(self):
-        """Get active window information for Windows.
-        
-        Returns:
-            dict: Window information for Windows
-        """
-        import win32gui
-        import win32process
-        
-        window = win32gui.GetForegroundWindow()
-        _, pid = win32process.GetWindowThreadProcessId(window)
-        title = win32gui.GetWindowText(window)
+    # Windows are listed front to back; the first normal-layer window owned
+    # by the application is its frontmost one
+    windows = Quartz.CGWindowListCopyWindowInfo(
+        Quartz.kCGWindowListOptionOnScreenOnly | Quartz.kCGWindowListExcludeDesktopElements,
+        Quartz.kCGNullWindowID)
+    window_id = None
+    title = ''
+    for window in windows or ():
+        if window.get('kCGWindowOwnerPID') == pid and window.get('kCGWindowLayer') == 0:
+            if 'kCGWindowName' not in window:
+                log.debug("Window titles unavailable through Quartz, falling back to System Events")
+                return False
+            window_id = window.get('kCGWindowNumber')
+            title = window['kCGWindowName'] or ''
+            break
+
+    try:
+        _, create_time = _get_process_info(pid, window_id)
+    except psutil.Error:
+        create_time = None
+    return {'app': str(app.localizedName()), 'title': str(title), 'pid': pid, 'create_time': create_time}
+
+
+def _get_macos_helper():
+    """Start the persistent osascript helper on first use.
+
+    Returns:
+        subprocess.Popen: The running helper, or None if it cannot be used
+    """
+    if _state.osa_unavailable:
+        return None
+    if _state.osa is None or _state.osa.poll() is not None:
         try:
-            process = psutil.Process(pid)
-            app_name = process.name()
-            return {'app': app_name, 'title': title, 'pid': pid}
-        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            _state.osa = subprocess.Popen(
+                ['osascript', '-l', 'JavaScript', '-e', _MACOS_HELPER_SCRIPT],
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                text=True, bufsize=1)
+            atexit.register(_state.osa.terminate)
+        except OSError as e:
+            log.debug("Could not start osascript helper: %s", e)
+            _state.osa_unavailable = True
             return None
+    return _state.osa
+
 
-    def _get_macos_info(self):
-        """Get active window information for macOS.
-        
-        Returns:
-            dict: Window information for macOS
-        """
-        script = '''
-        tell application "System Events"
-            set frontApp to name of first application process whose frontmost is true
-            set frontAppPath to path of first application process whose frontmost is true
-            set windowTitle to ""
-            tell process frontApp
-                if exists (1st window whose value of attribute "AXMain" is true) then
-                    set windowTitle to name of 1st window whose value of attribute "AXMain" is true
-                end if
-            end tell
-            return {frontApp, windowTitle, frontAppPath}
+def _stop_macos_helper():
+    """Stop the osascript helper and stop using it."""
+    if _state.osa is not None:
+        _state.osa.kill()
+        _state.osa = None
+    _state.osa_unavailable = True
+
+
+def _get_macos_info():
+    """Get active window information for macOS.
+
+    Returns:
+        dict: Window information for macOS
+    """
+    if not _state.pyobjc_unavailable:
+        frameworks = _pyobjc()
+        if frameworks is not None:
+            info = _get_pyobjc_info(*frameworks)
+            if info is not False:
+                return info
+        _state.pyobjc_unavailable = True
+
+    helper = _get_macos_helper()
+    if helper is not None:
+        try:
+            helper.stdin.write('\n')
+            ready, _, _ = select.select([helper.stdout], [], [], MACOS_HELPER_TIMEOUT)
+            line = helper.stdout.readline() if ready else ''
+            if line:
+                info = json.loads(line)
+                if info is None:
+                    return None
+                return {'app': info['app'], 'title': info['title'], 'pid': info['pid'], 'create_time': None}
+            log.debug("osascript helper did not respond, falling back")
+        except (OSError, ValueError, KeyError) as e:
+            log.debug("osascript helper failed: %s", e)
+        _stop_macos_helper()
+    return _get_macos_info_oneshot()
+
+
+def _get_macos_info_oneshot():
+    """Get active window information for macOS by running osascript once.
+
+    Returns:
+        dict: Window information for macOS
+    """
+    script = '''
+    tell application "System Events"
+        set frontApp to name of first application process whose frontmost is true
+        set frontAppPath to path of first application process whose frontmost is true
+        set windowTitle to ""
+        tell process frontApp
+            if exists (1st window whose value of attribute "AXMain" is true) then
+                set windowTitle to name of 1st window whose value of attribute "AXMain" is true
+            end if
         end tell
-        '''
-        result = subprocess.run(['osascript', '-e', script], capture_output=True, text=True)
-        if result.returncode == 0:
-            output = result.stdout.strip().split(', ')
-            if len(output) >= 2:
-                return {'app': output[0], 'title': output[1], 'pid': None}
+        return {frontApp, windowTitle, frontAppPath}
+    end tell
+    '''
+    result = subprocess.run(['osascript', '-e', script], capture_output=True, text=True)
+    if result.returncode == 0:
+        output = result.stdout.strip().split(', ')
+        if len(output) >= 2:
+            return {'app': output[0], 'title': output[1], 'pid': None, 'create_time': None}
+    return None
+
+
+def _get_xlib_session():
+    """Open a persistent X connection on first use.
+
+    Returns:
+        dict: The display, root window and interned atoms, or None if
+            python-xlib is missing or the X server cannot be reached
+    """
+    if _state.xlib is None and not _state.xlib_unavailable:
+        try:
+            xdisplay, _ = _xlib()
+            display = xdisplay.Display()
+            _state.xlib = {
+                'display': display,
+                'root': display.screen().root,
+                'atoms': {name: display.intern_atom(name)
+                          for name in ('_NET_ACTIVE_WINDOW', '_NET_WM_PID', '_NET_WM_NAME', 'UTF8_STRING')},
+            }
+        except Exception as e:
+            log.debug("Xlib unavailable, falling back to xdotool: %s", e)
+            _state.xlib_unavailable = True
+    return _state.xlib
+
+
+def _get_xlib_info(session):
+    """Get active window information over an open X connection.
+
+    All properties are read over the same socket, so no processes are spawned.
+
+    Args:
+        session (dict): Session returned by _get_xlib_session
+
+    Returns:
+        dict: Window information, or None if no window is active
+    """
+    _, X = _xlib()
+    atoms = session['atoms']
+    active = session['root'].get_full_property(atoms['_NET_ACTIVE_WINDOW'], X.AnyPropertyType)
+    if not active or not active.value or not active.value[0]:
         return None
 
-    def _get_linux_info(self):
-        """Get active window information for Linux.
-        
-        Returns:
-            dict: Window information for Linux
-        """
-        import os
-        print("Debug - Attempting Linux window detection")  # Debug log
-        
-        # Try xdotool first since it's specifically for active window
+    window_id = int(active.value[0])
+    window = session['display'].create_resource_object('window', window_id)
+    pid_prop = window.get_full_property(atoms['_NET_WM_PID'], X.AnyPropertyType)
+    if not pid_prop or not pid_prop.value:
+        return None
+    pid = int(pid_prop.value[0])
+
+    name_prop = window.get_full_property(atoms['_NET_WM_NAME'], atoms['UTF8_STRING'])
+    if name_prop and name_prop.value:
+        title = name_prop.value
+        if isinstance(title, bytes):
+            title = title.decode('utf-8', 'replace')
+    else:
+        title = window.get_wm_name() or ''
+
+    app_name, create_time = _get_process_info(pid, window_id)
+    return {'app': app_name, 'title': title, 'pid': pid, 'create_time': create_time}
+
+
+def _get_linux_info():
+    """Get active window information for Linux.
+
+    Returns:
+        dict: Window information for Linux
+    """
+    log.debug("Attempting Linux window detection")
+
+    # Query X directly over a persistent connection when possible
+    session = _get_xlib_session()
+    if session is not None:
         try:
-            print("Debug - Trying xdotool method")  # Debug log
-            window_id = subprocess.check_output(['xdotool', 'getactivewindow']).decode().strip()
-            window_pid = subprocess.check_output(['xdotool', 'getwindowpid', window_id]).decode().strip()
-            window_name = subprocess.check_output(['xdotool', 'getwindowname', window_id]).decode().strip()
-            
-            process = psutil.Process(int(window_pid))
-            app_name = process.name()
-            
-            info = {'app': app_name, 'title': window_name, 'pid': int(window_pid)}
-            print(f"Debug - xdotool found window: {info}")  # Debug log
+            info = _get_xlib_info(session)
+            log.debug("Xlib found window: %s", info)
             return info
+        except Exception as e:
+            log.debug("Xlib failed: %s", e)
+
+    # Try xdotool first since it's specifically for active window
+    try:
+        log.debug("Trying xdotool method")
+        window_id = subprocess.check_output(['xdotool', 'getactivewindow']).decode().strip()
+        window_pid = subprocess.check_output(['xdotool', 'getwindowpid', window_id]).decode().strip()
+        window_name = subprocess.check_output(['xdotool', 'getwindowname', window_id]).decode().strip()
+
+        app_name, create_time = _get_process_info(int(window_pid), window_id)
+
+        info = {'app': app_name, 'title': window_name, 'pid': int(window_pid), 'create_time': create_time}
+        log.debug("xdotool found window: %s", info)
+        return info
 
+    except Exception as e:
+        log.debug("xdotool failed: %s", e)
+        try:
+            # Try wmctrl as fallback
+            log.debug("Trying wmctrl method")
+            # Get the active window ID using wmctrl
+            active_window = subprocess.check_output(['xprop', '-root', '_NET_ACTIVE_WINDOW']).decode()
+            window_id = active_window.split()[-1]
+
+            # Get window list and find the active window
+            window_list = subprocess.check_output(['wmctrl', '-l', '-p']).decode().strip().split('\n')
+            for window in window_list:
+                parts = window.split()
+                if window_id in parts[0]:  # Match window ID
+                    pid = int(parts[2])
+                    app_name, create_time = _get_process_info(pid, window_id)
+                    info = {
+                        'app': app_name,
+                        'title': ' '.join(parts[4:]),
+                        'pid': pid,
+                        'create_time': create_time
+                    }
+                    log.debug("wmctrl found window: %s", info)
+                    return info
         except Exception as e:
-            print(f"Debug - xdotool failed: {e}")
-            try:
-                # Try wmctrl as fallback
-                print("Debug - Trying wmctrl method")  # Debug log
-                # Get the active window ID using wmctrl
-                active_window = subprocess.check_output(['xprop', '-root', '_NET_ACTIVE_WINDOW']).decode()
-                window_id = active_window.split()[-1]
-                
-                # Get window list and find the active window
-                window_list = subprocess.check_output(['wmctrl', '-l', '-p']).decode().strip().split('\n')
-                for window in window_list:
-                    parts = window.split()
-                    if window_id in parts[0]:  # Match window ID
-                        pid = int(parts[2])
-                        process = psutil.Process(pid)
-                        info = {
-                            'app': process.name(),
-                            'title': ' '.join(parts[4:]),
-                            'pid': pid
-                        }
-                        print(f"Debug - wmctrl found window: {info}")  # Debug log
-                        return info
-            except Exception as e:
-                print(f"Debug - wmctrl failed: {e}")
-                try:
-                    # Try psutil as last resort
-                    print("Debug - Trying psutil as last resort")  # Debug log
-                    for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
-                        try:
-                            if proc.info['name'] not in ['explorer.exe', 'Finder', 'SystemUI']:
-                                info = {
-                                    'app': proc.info['name'],
-                                    'title': ' '.join(proc.info['cmdline']) if proc.info['cmdline'] else proc.info['name'],
-                                    'pid': proc.info['pid']
-                                }
-                                print(f"Debug - psutil found process: {info}")  # Debug log
-                                return info
-                        except (psutil.NoSuchProcess, psutil.AccessDenied):
-                            continue
-                except Exception as e:
-                    print(f"Debug - All window detection methods failed: {e}")
-                    return None
\ No newline at end of file
+            log.debug("wmctrl failed: %s", e)
+
+    # The first process in the process table says nothing about which window
+    # has focus, so report no window and let the tracker log the sample as Idle
+    log.debug("All window detection methods failed")
+    return None
+
+
+# Window query for the current platform, chosen once at import
+_get_platform_info = {
+    'Windows': _get_windows_info,
+    'Darwin': _get_macos_info,
+    'Linux': _get_linux_info,
+}.get(_SYSTEM)
+
+
+class WindowTracker:
+    """Compatibility wrapper around the module-level window functions."""
+
+    get_active_window_info = staticmethod(get_active_window_info)
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""Reading and writing of daily activity logs.
+
+Logs are stored as newline-delimited JSON with one activity per line, so
+that recording a sample only touches the end of the file instead of
+rewriting the whole day. Logs of past days are gzip-compressed. Logs
+written by older versions as a single JSON array are still readable.
+"""
+import os
+import gzip
+import shutil
+import logging
+from . import serialization
+
+log = logging.getLogger(__name__)
+
+# fdatasync skips flushing metadata such as the modification time, but it is
+# not available on every platform
+_fdatasync = getattr(os, 'fdatasync', os.fsync)
+
+
+def _write_all(fd, data):
+    """Write all of data to a file descriptor.
+
+    os.write may write only part of the buffer, e.g. when the disk is full.
+
+    Args:
+        fd (int): File descriptor to write to
+        data (bytes): Data to write
+
+    Raises:
+        OSError: If the data cannot be written completely
+    """
+    view = memoryview(data)
+    while view:
+        written = os.write(fd, view)
+        if not written:
+            raise OSError("short write to activity log")
+        view = view[written:]
+
+
+def iter_activities(path):
+    """Iterate over the activities in a log file.
+
+    NDJSON logs are decoded one line at a time, so the caller can reduce a
+    day's activities without holding all of them in memory. Lines that are
+    not valid JSON are skipped with a warning.
+
+    Args:
+        path (str): Path to an NDJSON log, a gzip-compressed NDJSON log or a
+            legacy JSON array log
+
+    Yields:
+        dict: Activities in the order they were logged
+
+    Raises:
+        serialization.JSONDecodeError: If a legacy log contains invalid JSON
+        ValueError: If a legacy log does not contain a list
+    """
+    f = gzip.open(path, 'rb') if path.endswith('.gz') else open(path, 'rb')
+    with f:
+        if not path.endswith(('.ndjson', '.ndjson.gz')):
+            activities = serialization.loads(f.read())
+            if not isinstance(activities, list):
+                raise ValueError("expected a list of activities")
+            yield from activities
+            return
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            # A line torn by a crash only loses that one activity
+            try:
+                activity = serialization.loads(line)
+            except serialization.JSONDecodeError as e:
+                log.warning("Skipping unreadable line %d of %s: %s", line_number, path, e)
+                continue
+            yield activity
+
+
+def read_activities(path):
+    """Read all activities from a log file.
+
+    Args:
+        path (str): Path to an NDJSON log, a gzip-compressed NDJSON log or a
+            legacy JSON array log
+
+    Returns:
+        list: Activity dictionaries in the order they were logged
+
+    Raises:
+        serialization.JSONDecodeError: If a legacy log contains invalid JSON
+        ValueError: If a legacy log does not contain a list
+    """
+    return list(iter_activities(path))
+
+
+def compress_log(path):
+    """Gzip-compress a finished NDJSON log and remove the original.
+
+    The compressed file is written under a temporary name first, so a crash
+    never leaves a truncated log behind.
+
+    Args:
+        path (str): Path to the NDJSON log
+
+    Returns:
+        str: Path to the compressed log
+    """
+    gz_path = path + '.gz'
+    tmp_path = gz_path + '.tmp'
+    with open(path, 'rb') as src, gzip.open(tmp_path, 'wb') as dst:
+        shutil.copyfileobj(src, dst)
+    os.replace(tmp_path, gz_path)
+    os.remove(path)
+    return gz_path
+
+
+class ActivityLog:
+    """Append-only NDJSON log for a single day's activities.
+
+    The file is kept open for appending between samples instead of being
+    reopened for every write, and is only flushed to disk every few writes.
+    Updates to the last activity are held back until the duration missing
+    from the file reaches a limit. Call close() when the log is no longer needed.
+    """
+
+    # Number of writes between flushes of the log to disk
+    SYNC_INTERVAL = 10
+
+    def __init__(self, path, max_pending_duration=300):
+        """Initialize the activity log.
+
+        Args:
+            path (str): Path to the NDJSON log file
+            max_pending_duration (int): Seconds of duration an update to the
+                last activity may add before it is written out
+        """
+        self.path = path
+        self.max_pending_duration = max_pending_duration
+        self._fd = None
+        self._size = 0
+        self._last_record_offset = None
+        self._unsynced_writes = 0
+        self._pending_last = None
+        # Duration of the last activity as currently written to the file
+        self._written_duration = 0
+
+    def _get_fd(self):
+        """Open the log file for appending on first use.
+
+        Returns:
+            int: File descriptor of the log
+        """
+        if self._fd is None:
+            flags = os.O_WRONLY | os.O_CREAT | os.O_APPEND | getattr(os, 'O_BINARY', 0)
+            self._fd = os.open(self.path, flags, 0o644)
+            self._size = os.fstat(self._fd).st_size
+            # Terminate a line left incomplete by a crash, so the next record
+            # starts on a line of its own
+            if self._size and not self._ends_with_newline():
+                _write_all(self._fd, b'\n')
+                self._size += 1
+        return self._fd
+
+    def _ends_with_newline(self):
+        """Check whether the log file ends with a newline.
+
+        Returns:
+            bool: True if the last byte of the file is a newline
+        """
+        with open(self.path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b'\n'
+
+    def _write_record(self, activity):
+        """Write an activity as the last line of the log.
+
+        Args:
+            activity (dict): Activity to write
+        """
+        fd = self._get_fd()
+        data = serialization.dumps(activity) + b'\n'
+        offset = self._size
+        try:
+            _write_all(fd, data)
+        except OSError:
+            # Drop a partially written record so the file matches _size again
+            os.ftruncate(fd, offset)
+            raise
+        self._last_record_offset = offset
+        self._size = offset + len(data)
+        self._written_duration = activity.get('duration', 0)
+
+        self._unsynced_writes += 1
+        if self._unsynced_writes >= self.SYNC_INTERVAL:
+            self.sync()
+
+    def append(self, activity):
+        """Append a new activity to the end of the log.
+
+        Args:
+            activity (dict): Activity to record
+        """
+        self.flush()
+        self._write_record(activity)
+
+    def replace_last(self, activity):
+        """Overwrite the most recently appended activity in place.
+
+        Only the last line of the file is rewritten. The write is deferred
+        until the activity's duration is max_pending_duration seconds ahead
+        of the file, another activity is appended, or the log is flushed. If
+        nothing has been appended through this log yet, the activity is
+        appended instead.
+
+        Args:
+            activity (dict): Updated version of the last activity
+        """
+        if self._last_record_offset is None:
+            self.append(activity)
+            return
+        self._pending_last = activity
+        if activity.get('duration', 0) - self._written_duration >= self.max_pending_duration:
+            self.flush()
+
+    def flush(self):
+        """Write out a held back update to the last activity."""
+        activity = self._pending_last
+        if activity is None:
+            return
+        os.ftruncate(self._get_fd(), self._last_record_offset)
+        self._size = self._last_record_offset
+        self._write_record(activity)
+        # Only dropped once written, so a failed write is retried by the next flush
+        self._pending_last = None
+
+    def sync(self):
+        """Flush pending writes to disk."""
+        if self._fd is not None and self._unsynced_writes:
+            _fdatasync(self._fd)
+        self._unsynced_writes = 0
+
+    def close(self):
+        """Flush pending writes and close the log file."""
+        self.flush()
+        if self._fd is not None:
+            self.sync()
+            os.close(self._fd)
+            self._fd = None
+
+    def write_all(self, activities):
+        """Replace the whole log with the given activities.
+
+        Used when migrating a legacy log; the file is written to a temporary
+        path first so that a crash never leaves a half-written log behind.
+
+        Args:
+            activities (list): Activities to write
+        """
+        self.close()
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            for activity in activities:
+                f.write(serialization.dumps(activity) + b'\n')
+        os.replace(tmp_path, self.path)
+        self._last_record_offset = None
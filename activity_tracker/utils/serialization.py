@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""JSON encoding helpers.
+
+Uses orjson when it is installed, then ujson, and falls back to the
+standard library ``json`` module otherwise. Every backend encodes to bytes
+so that callers can open files in binary mode regardless of the one in use.
+"""
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+if orjson is not None:
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError
+    JSONDecodeError = orjson.JSONDecodeError
+    _loads = orjson.loads
+
+    def _dumps(obj, pretty):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+
+elif ujson is not None:
+    # Older ujson releases raise a plain ValueError
+    JSONDecodeError = getattr(ujson, 'JSONDecodeError', ValueError)
+    _loads = ujson.loads
+
+    def _dumps(obj, pretty):
+        return ujson.dumps(obj, indent=4 if pretty else 0, ensure_ascii=False,
+                           escape_forward_slashes=False).encode('utf-8')
+
+else:
+    JSONDecodeError = json.JSONDecodeError
+    _loads = json.loads
+
+    def _dumps(obj, pretty):
+        if pretty:
+            return json.dumps(obj, indent=4).encode('utf-8')
+        # Match orjson's compact output; the default separators add spaces
+        return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def loads(data):
+    """Deserialize JSON from bytes or str.
+
+    Args:
+        data (bytes or str): JSON document
+
+    Returns:
+        The decoded Python object
+    """
+    return _loads(data)
+
+
+def dumps(obj, pretty=False):
+    """Serialize an object to JSON.
+
+    Args:
+        obj: Object to serialize
+        pretty (bool): Indent the output for human readers
+
+    Returns:
+        bytes: UTF-8 encoded JSON document
+    """
+    return _dumps(obj, pretty)
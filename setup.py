@@ -19,18 +19,20 @@ setup(
         "License :: OSI Approved :: MIT License",
         "Operating System :: OS Independent",
         "Programming Language :: Python :: 3",
-        "Programming Language :: Python :: 3.6",
         "Programming Language :: Python :: 3.7",
         "Programming Language :: Python :: 3.8",
         "Programming Language :: Python :: 3.9",
         "Topic :: Office/Business :: News/Diary",
         "Topic :: System :: Monitoring",
     ],
-    python_requires=">=3.6",
+    python_requires=">=3.7",
     install_requires=[
         "psutil>=5.7.0",
         "pywin32;platform_system=='Windows'",
     ],
+    extras_require={
+        "fast": ["orjson>=3.0", "ujson>=2.0"],
+    },
     entry_points={
         "console_scripts": [
             "activity-tracker=activity_tracker.cli:main",